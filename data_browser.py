@@ -0,0 +1,266 @@
+import numpy as np
+import pandas as pd
+
+# Maximaal aantal sorteerindexen, filtermaskers en views dat per bestand in de cache blijft
+MAX_CACHED_SORTS = 4
+MAX_CACHED_MASKS = 32
+MAX_CACHED_VIEWS = 8
+
+# Boven dit aantal unieke waarden wordt een categorische kolom op tekst gefilterd
+MAX_FILTER_CATEGORIES = 200
+
+
+def build_browse_index(df):
+    """
+    Bereidt een DataFrame voor op snel bladeren, filteren en sorteren.
+
+    Tekstkolommen worden categorisch gecodeerd zodat sorteren en filteren op
+    integer codes werkt in plaats van op Python strings. Sorteerindexen en
+    filtermaskers worden lui opgebouwd en per kolom of filterstatus bewaard,
+    zodat een rerun met dezelfde instellingen niets opnieuw berekent.
+
+    Parameters:
+    - df: Het geüploade DataFrame
+
+    Returns:
+    - index: Dictionary met het gecodeerde DataFrame en de caches
+    """
+    frame = df.copy(deep=False)
+    for column in frame.columns:
+        series = frame[column]
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            continue
+        if pd.api.types.is_object_dtype(series) or pd.api.types.is_string_dtype(series):
+            try:
+                frame[column] = series.astype('category')
+            except TypeError:
+                # Gemengde types zijn niet te sorteren, codeer dan de tekstweergave
+                frame[column] = series.astype(str).astype('category')
+
+    return {
+        'frame': frame,
+        'sort_cache': {},
+        'mask_cache': {},
+        'predicate_cache': {},
+        'view_cache': {},
+        'column_cache': {}
+    }
+
+def _store(cache, key, value, limit):
+    """Voegt een waarde toe aan een cache en verwijdert de oudste bij overschrijding"""
+    cache[key] = value
+    while len(cache) > limit:
+        cache.pop(next(iter(cache)))
+    return value
+
+def _position_dtype(length):
+    """Kiest int32 voor rijposities als dat past, dat halveert het geheugen van sorteerindexen en views"""
+    return np.int32 if length < 2**31 else np.int64
+
+def _sort_key(series):
+    """Geeft een numerieke sorteersleutel en een masker met ontbrekende waarden terug"""
+    missing = series.isna().to_numpy()
+
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        codes = series.cat.codes.to_numpy()
+        categories = series.cat.categories
+        try:
+            ordered = categories.is_monotonic_increasing
+        except TypeError:
+            ordered = False
+        if ordered:
+            return codes, missing
+        # Categorieën zonder natuurlijke volgorde sorteren we op hun tekst
+        rank = np.empty(len(categories), dtype=np.int64)
+        rank[np.argsort(categories.astype(str), kind='stable')] = np.arange(len(categories))
+        return rank[codes], missing
+
+    if pd.api.types.is_bool_dtype(series):
+        return series.fillna(False).to_numpy(dtype=np.int8), missing
+    if pd.api.types.is_datetime64_any_dtype(series) or pd.api.types.is_timedelta64_dtype(series):
+        return np.asarray(series.array.asi8), missing
+    if pd.api.types.is_integer_dtype(series) and not missing.any():
+        return series.to_numpy(), missing
+    if pd.api.types.is_numeric_dtype(series):
+        return series.to_numpy(dtype=np.float64, na_value=np.nan), missing
+
+    codes = pd.Categorical(series.astype(str)).codes
+    return codes, missing
+
+def _sorted_positions(index, column):
+    """Geeft de (gecachete) oplopende sorteervolgorde van een kolom terug"""
+    cache = index['sort_cache']
+    if column in cache:
+        return cache[column]
+
+    key, missing = _sort_key(index['frame'][column])
+    dtype = _position_dtype(len(key))
+    # Stabiel sorteren van kleine integer codes gebruikt radix sort;
+    # voor brede sleutels is quicksort een factor drie sneller
+    kind = 'stable' if key.dtype.itemsize <= 2 else 'quicksort'
+    if missing.any():
+        valid = np.flatnonzero(~missing)
+        order = valid[np.argsort(key[valid], kind=kind)]
+    else:
+        order = np.argsort(key, kind=kind)
+    positions = (order.astype(dtype, copy=False), np.flatnonzero(missing).astype(dtype, copy=False))
+    return _store(cache, column, positions, MAX_CACHED_SORTS)
+
+def _predicate_mask(index, predicate):
+    """
+    Evalueert één filterpredicaat als booleaans masker.
+
+    Een predicaat is een tuple (kolom, operator, waarde) met operator:
+    - 'in': waarde is een tuple met toegestane waarden
+    - 'between': waarde is een tuple (ondergrens, bovengrens), None voor open
+    - 'contains': waarde is een zoektekst (hoofdletterongevoelig)
+    """
+    cache = index['predicate_cache']
+    if predicate in cache:
+        return cache[predicate]
+
+    column, operator, value = predicate
+    series = index['frame'][column]
+
+    if isinstance(series.dtype, pd.CategoricalDtype) and operator in ('in', 'contains'):
+        # Evalueer op de (weinige) categorieën en vertaal via de codes naar rijen
+        categories = series.cat.categories
+        if operator == 'in':
+            hits = categories.isin(value)
+        else:
+            hits = categories.astype(str).str.contains(value, case=False, regex=False)
+        # Code -1 (ontbrekend) wijst naar het laatste, altijd False element
+        lookup = np.append(np.asarray(hits, dtype=bool), False)
+        mask = lookup[series.cat.codes.to_numpy()]
+    elif operator == 'in':
+        mask = series.isin(value).to_numpy()
+    elif operator == 'between':
+        low, high = value
+        mask = np.ones(len(series), dtype=bool)
+        if low is not None:
+            mask &= (series >= low).to_numpy(dtype=bool, na_value=False)
+        if high is not None:
+            mask &= (series <= high).to_numpy(dtype=bool, na_value=False)
+    elif operator == 'contains':
+        mask = series.astype(str).str.contains(value, case=False, regex=False).to_numpy()
+    else:
+        raise ValueError(f"Onbekende filteroperator: {operator}")
+
+    return _store(cache, predicate, mask, MAX_CACHED_MASKS)
+
+def _filter_mask(index, filters):
+    """Combineert alle predicaten tot één masker, of None als er niet gefilterd wordt"""
+    if not filters:
+        return None
+
+    key = frozenset(filters)
+    cache = index['mask_cache']
+    if key in cache:
+        return cache[key]
+
+    mask = None
+    for predicate in filters:
+        predicate_mask = _predicate_mask(index, predicate)
+        mask = predicate_mask.copy() if mask is None else mask & predicate_mask
+
+    return _store(cache, key, mask, MAX_CACHED_MASKS)
+
+def _view_positions(index, filters, sort_column, ascending):
+    """Geeft de rijposities van de gefilterde en gesorteerde weergave terug"""
+    key = (frozenset(filters or ()), sort_column, ascending)
+    cache = index['view_cache']
+    if key in cache:
+        return cache[key]
+
+    mask = _filter_mask(index, filters)
+    dtype = _position_dtype(len(index['frame']))
+    if sort_column is None:
+        if mask is None:
+            positions = np.arange(len(index['frame']), dtype=dtype)
+        else:
+            positions = np.flatnonzero(mask).astype(dtype, copy=False)
+    else:
+        order, missing = _sorted_positions(index, sort_column)
+        # Ontbrekende waarden komen in beide richtingen achteraan
+        positions = np.concatenate([order if ascending else order[::-1], missing])
+        if mask is not None:
+            positions = positions[mask[positions]]
+
+    return _store(cache, key, positions, MAX_CACHED_VIEWS)
+
+def count_rows(index, filters=()):
+    """Telt het aantal rijen dat aan de filters voldoet"""
+    mask = _filter_mask(index, filters)
+    if mask is None:
+        return len(index['frame'])
+    return int(np.count_nonzero(mask))
+
+def browse_page(index, filters=(), sort_column=None, ascending=True,
+                page=1, page_size=100, columns=None):
+    """
+    Geeft één pagina van de gefilterde en gesorteerde data terug.
+
+    Alleen de rijen van de gevraagde pagina worden uit het DataFrame gehaald,
+    zodat er nooit meer dan page_size rijen naar de browser gaan.
+
+    Returns:
+    - page_df: DataFrame met de rijen van de pagina
+    - total_rows: Aantal rijen na filteren
+    - page_count: Aantal pagina's
+    """
+    positions = _view_positions(index, filters, sort_column, ascending)
+    total_rows = len(positions)
+    page_count = max(1, -(-total_rows // page_size))
+    page = min(max(1, page), page_count)
+
+    start = (page - 1) * page_size
+    rows = positions[start:start + page_size]
+
+    frame = index['frame']
+    if columns is not None:
+        page_df = frame.iloc[rows, frame.columns.get_indexer(list(columns))]
+    else:
+        page_df = frame.iloc[rows]
+
+    return page_df, total_rows, page_count
+
+def filtered_frame(index, filters=(), sort_column=None, ascending=True, columns=None):
+    """Geeft de volledige gefilterde en gesorteerde data terug (voor export)"""
+    positions = _view_positions(index, filters, sort_column, ascending)
+    frame = index['frame']
+    if columns is not None:
+        return frame.iloc[positions, frame.columns.get_indexer(list(columns))]
+    return frame.iloc[positions]
+
+def describe_column(index, column):
+    """
+    Beschrijft een kolom voor het opbouwen van filterbesturing.
+
+    Returns:
+    - Dictionary met 'kind' ('categorisch', 'tekst', 'numeriek', 'datum' of
+      'overig') en afhankelijk daarvan 'categories' of 'min'/'max'
+    """
+    cache = index['column_cache']
+    if column in cache:
+        return cache[column]
+
+    series = index['frame'][column]
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        categories = series.cat.categories
+        if len(categories) <= MAX_FILTER_CATEGORIES:
+            info = {'kind': 'categorisch', 'categories': list(categories)}
+        else:
+            info = {'kind': 'tekst'}
+    elif pd.api.types.is_bool_dtype(series):
+        info = {'kind': 'categorisch', 'categories': [False, True]}
+    elif series.isna().all():
+        info = {'kind': 'overig'}
+    elif pd.api.types.is_numeric_dtype(series):
+        info = {'kind': 'numeriek', 'min': series.min(), 'max': series.max()}
+    elif pd.api.types.is_datetime64_any_dtype(series):
+        info = {'kind': 'datum', 'min': series.min(), 'max': series.max()}
+    else:
+        info = {'kind': 'overig'}
+
+    cache[column] = info
+    return info
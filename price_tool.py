@@ -6,6 +6,13 @@ import base64
 from datetime import datetime
 from PIL import Image
 
+from data_browser import build_browse_index, browse_page, count_rows, describe_column, filtered_frame
+from pricing_logic import (save_scenario, load_scenario, load_scenario_library, save_scenario_library,
+                           add_scenario_to_library, scenario_comparison_df, portfolio_impact,
+                           optimize_tariff, purchase_schedule_df,
+                           batch_purchase_plans_df, tariff_to_cents, format_cents, TARIFF_PARAMETERS,
+                           TARIFF_PARAMETER_LABELS, TARIFF_MONEY_PARAMETERS)
+
 # Stel de pagina-configuratie in
 st.set_page_config(
     page_title="GHX Price Tool",
@@ -116,7 +123,7 @@ def calculate_costs(orders, small_start_cost, small_start_orders,
                    small_prepaid_cost, small_prepaid_orders,
                    big_prepaid_cost, big_prepaid_orders,
                    overage_cost):
-    """Berekent de optimale kosten voor een gegeven aantal orders"""
+    """Berekent de optimale kosten voor een gegeven aantal orders (bedragen in centen)"""
     # Bepaal welke startbundel te gebruiken
     if small_start_orders >= orders:
         # Small bundel is voldoende
@@ -198,7 +205,7 @@ def display_costs_df(orders, small_start_cost, small_start_orders,
                     small_prepaid_cost, small_prepaid_orders,
                     big_prepaid_cost, big_prepaid_orders,
                     overage_cost):
-    """Genereer een DataFrame met kosten voor verschillende strategieën"""
+    """Genereer een DataFrame met kosten voor verschillende strategieën (bedragen in centen)"""
     strategies = []
     
     # Small Start
@@ -260,8 +267,8 @@ def display_costs_df(orders, small_start_cost, small_start_orders,
     df = df.sort_values('Kosten')
     
     # Formateer kolommen
-    df['Kosten'] = df['Kosten'].map('€{:.2f}'.format)
-    df['Kosten per Order'] = df['Kosten per Order'].map('€{:.2f}'.format)
+    df['Kosten'] = df['Kosten'].map(format_cents)
+    df['Kosten per Order'] = df['Kosten per Order'].round().map(format_cents)
     
     return df
 
@@ -289,6 +296,45 @@ def download_link(df, filename, link_text):
     
     return f'<a href="{href}" download="{filename}">{link_text}</a>'
 
+# Maximaal aantal datarijen in een Excel werkblad (exclusief header)
+EXCEL_MAX_ROWS = 1048575
+
+def get_browse_index(uploaded_file):
+    """Bewaart de browse-index per geüpload bestand in de sessie, zodat de caches reruns overleven"""
+    file_key = (uploaded_file.name, uploaded_file.size)
+    if st.session_state.get('browse_index_key') != file_key:
+        st.session_state['browse_index'] = build_browse_index(process_uploaded_file(uploaded_file))
+        st.session_state['browse_index_key'] = file_key
+    return st.session_state['browse_index']
+
+# Standaard tariefparameters van alle tariefinvoer (in euro's)
+DEFAULT_TARIFF = {
+    'small_start_cost': 1000, 'small_start_orders': 100,
+    'big_start_cost': 2000, 'big_start_orders': 1350,
+    'small_prepaid_cost': 250, 'small_prepaid_orders': 250,
+    'big_prepaid_cost': 1000, 'big_prepaid_orders': 1100,
+    'overage_cost': 2.0
+}
+
+def tariff_parameter_input(name, key_prefix=None):
+    """Toont het invoerveld van één tariefparameter met de standaardwaarde uit DEFAULT_TARIFF"""
+    key = f"{key_prefix}_{name}" if key_prefix else None
+    if name == 'overage_cost':
+        return st.number_input("Overage Kosten per Order (€)", min_value=0.0, value=DEFAULT_TARIFF[name], step=0.1, key=key)
+    if name in TARIFF_MONEY_PARAMETERS:
+        return st.number_input(f"{TARIFF_PARAMETER_LABELS[name]} (€)", min_value=0, value=DEFAULT_TARIFF[name], key=key)
+    return st.number_input(TARIFF_PARAMETER_LABELS[name], min_value=1, value=DEFAULT_TARIFF[name], key=key)
+
+def tariff_inputs(title, key_prefix, scenarios):
+    """Toont invoervelden voor een tarief, handmatig of uit de scenario bibliotheek"""
+    st.subheader(title)
+    source = st.selectbox("Bron", ["Handmatig"] + [scenario['name'] for scenario in scenarios], key=f"{key_prefix}_source")
+    if source != "Handmatig":
+        parameters = load_scenario(next(scenario for scenario in scenarios if scenario['name'] == source))
+        return {name: parameters[name] for name in TARIFF_PARAMETERS}
+
+    return {name: tariff_parameter_input(name, key_prefix) for name in TARIFF_PARAMETERS}
+
 # Uitleg van de app toevoegen
 with st.expander("ℹ️ Over deze app", expanded=False):
     st.markdown("""
@@ -303,81 +349,450 @@ with st.expander("ℹ️ Over deze app", expanded=False):
     Deze tool helpt je bij het maken van de juiste prijsbeslissingen voor GHX klanten.
     """)
 
+# Modus keuze in de zijbalk
+modus = st.sidebar.radio("Modus", ["Prijscalculator", "Data Upload & Bewerking", "Scenario Bibliotheek",
+                                    "Portefeuille Impact", "Tarief Optimalisatie", "Bundelplanner"])
+
 # Prijscalculator interface zonder tabs
-st.header("📊 Prijscalculator")
+if modus == "Prijscalculator":
+    st.header("📊 Prijscalculator")
 
-# Prijscalculator functionaliteit
-with st.expander("⚙️ Parameters", expanded=True):
-    col1, col2 = st.columns(2)
+    # Prijscalculator functionaliteit
+    with st.expander("⚙️ Parameters", expanded=True):
+        col1, col2 = st.columns(2)
     
-    with col1:
-        st.subheader("Algemeen")
-        orders = st.number_input("Aantal Orders", min_value=1, value=5000)
+        with col1:
+            st.subheader("Algemeen")
+            orders = st.number_input("Aantal Orders", min_value=1, value=5000)
         
-        st.subheader("Start Bundels")
-        small_start_cost = st.number_input("Small Start Kosten (€)", min_value=0, value=1000)
-        small_start_orders = st.number_input("Small Start Orders", min_value=1, value=100)
+            st.subheader("Start Bundels")
+            small_start_cost = tariff_parameter_input('small_start_cost')
+            small_start_orders = tariff_parameter_input('small_start_orders')
         
-        big_start_cost = st.number_input("Big Start Kosten (€)", min_value=0, value=2000)
-        big_start_orders = st.number_input("Big Start Orders", min_value=1, value=1350)
+            big_start_cost = tariff_parameter_input('big_start_cost')
+            big_start_orders = tariff_parameter_input('big_start_orders')
     
-    with col2:
-        st.subheader("Prepaid Bundels")
-        small_prepaid_cost = st.number_input("Small Prepaid Kosten (€)", min_value=0, value=250)
-        small_prepaid_orders = st.number_input("Small Prepaid Orders", min_value=1, value=250)
+        with col2:
+            st.subheader("Prepaid Bundels")
+            small_prepaid_cost = tariff_parameter_input('small_prepaid_cost')
+            small_prepaid_orders = tariff_parameter_input('small_prepaid_orders')
         
-        big_prepaid_cost = st.number_input("Big Prepaid Kosten (€)", min_value=0, value=1000)
-        big_prepaid_orders = st.number_input("Big Prepaid Orders", min_value=1, value=1100)
+            big_prepaid_cost = tariff_parameter_input('big_prepaid_cost')
+            big_prepaid_orders = tariff_parameter_input('big_prepaid_orders')
         
-        st.subheader("Overage")
-        overage_cost = st.number_input("Overage Kosten per Order (€)", min_value=0.0, value=2.0, step=0.1)
-
-# Bereken en toon resultaten
-if st.button("Berekenen", key="calculate_button", use_container_width=True):
-    total_cost, strategy = calculate_costs(
-        orders, small_start_cost, small_start_orders, 
-        big_start_cost, big_start_orders,
-        small_prepaid_cost, small_prepaid_orders,
-        big_prepaid_cost, big_prepaid_orders,
-        overage_cost
-    )
+            st.subheader("Overage")
+            overage_cost = tariff_parameter_input('overage_cost')
+
+    # Huidige parameters bewaren in de scenario bibliotheek
+    with st.expander("💾 Scenario opslaan", expanded=False):
+        scenario_name = st.text_input("Scenario naam")
+        if st.button("Opslaan in Scenario Bibliotheek"):
+            if scenario_name:
+                scenario = save_scenario(
+                    scenario_name, orders, small_start_cost, small_start_orders,
+                    big_start_cost, big_start_orders, small_prepaid_cost,
+                    small_prepaid_orders, big_prepaid_cost, big_prepaid_orders,
+                    overage_cost
+                )
+                save_scenario_library(add_scenario_to_library(load_scenario_library(), scenario))
+                st.success(f"Scenario '{scenario_name}' opgeslagen")
+            else:
+                st.warning("Geef het scenario een naam")
+
+    # Bereken en toon resultaten
+    if st.button("Berekenen", key="calculate_button", use_container_width=True):
+        # Geldbedragen gaan als hele centen de berekening in
+        tariff = tariff_to_cents({
+            'small_start_cost': small_start_cost, 'small_start_orders': small_start_orders,
+            'big_start_cost': big_start_cost, 'big_start_orders': big_start_orders,
+            'small_prepaid_cost': small_prepaid_cost, 'small_prepaid_orders': small_prepaid_orders,
+            'big_prepaid_cost': big_prepaid_cost, 'big_prepaid_orders': big_prepaid_orders,
+            'overage_cost': overage_cost
+        })
+        total_cost, strategy = calculate_costs(orders, **tariff)
     
-    col1, col2 = st.columns(2)
+        col1, col2 = st.columns(2)
     
-    with col1:
-        st.subheader("Optimale Strategie")
-        st.markdown(bundle_description(
-            strategy, orders, small_start_orders, big_start_orders,
-            small_prepaid_orders, big_prepaid_orders
-        ), unsafe_allow_html=True)
+        with col1:
+            st.subheader("Optimale Strategie")
+            st.markdown(bundle_description(
+                strategy, orders, small_start_orders, big_start_orders,
+                small_prepaid_orders, big_prepaid_orders
+            ), unsafe_allow_html=True)
     
-    with col2:
-        st.subheader("Kostenoverzicht")
-        st.metric("Totale Kosten", f"€{total_cost:.2f}")
-        st.metric("Kosten per Order", f"€{total_cost/orders:.2f}")
+        with col2:
+            st.subheader("Kostenoverzicht")
+            st.metric("Totale Kosten", format_cents(total_cost))
+            st.metric("Kosten per Order", format_cents(round(total_cost / orders)))
     
-    st.subheader("Vergelijking van Strategieën")
-    costs_df = display_costs_df(
-        orders, small_start_cost, small_start_orders, 
-        big_start_cost, big_start_orders,
-        small_prepaid_cost, small_prepaid_orders,
-        big_prepaid_cost, big_prepaid_orders,
-        overage_cost
-    )
-    st.dataframe(costs_df, use_container_width=True)
+        st.subheader("Vergelijking van Strategieën")
+        costs_df = display_costs_df(orders, **tariff)
+        st.dataframe(costs_df, use_container_width=True)
     
-    # Download optie - oplossing voor Excel error
-    buffer = io.BytesIO()
-    with pd.ExcelWriter(buffer, engine='openpyxl') as writer:
-        costs_df.to_excel(writer, index=False)
-    buffer.seek(0)
+        # Download optie - oplossing voor Excel error
+        buffer = io.BytesIO()
+        with pd.ExcelWriter(buffer, engine='openpyxl') as writer:
+            costs_df.to_excel(writer, index=False)
+        buffer.seek(0)
     
-    st.download_button(
-        label="Download Resultaten als Excel",
-        data=buffer,
-        file_name=f"prijsberekening_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx",
-        mime="application/vnd.ms-excel"
-    )
+        st.download_button(
+            label="Download Resultaten als Excel",
+            data=buffer,
+            file_name=f"prijsberekening_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx",
+            mime="application/vnd.ms-excel"
+        )
+
+elif modus == "Data Upload & Bewerking":
+    st.header("📁 Data Upload & Bewerking")
+
+    uploaded_file = st.file_uploader("Upload een Excel of CSV bestand", type=['xlsx', 'xls', 'csv'])
+
+    if uploaded_file is not None:
+        browse_index = get_browse_index(uploaded_file)
+        all_columns = list(browse_index['frame'].columns)
+
+        with st.expander("⚙️ Kolommen, sortering en filters", expanded=True):
+            selected_columns = st.multiselect("Kolommen", all_columns, default=all_columns)
+
+            col1, col2 = st.columns(2)
+            with col1:
+                sort_choice = st.selectbox("Sorteer op", ["(geen)"] + all_columns)
+            with col2:
+                sort_direction = st.radio("Volgorde", ["Oplopend", "Aflopend"], horizontal=True)
+
+            filters = []
+            for column in st.multiselect("Filter op kolommen", all_columns):
+                info = describe_column(browse_index, column)
+                if info['kind'] == 'categorisch':
+                    values = st.multiselect(f"{column}", info['categories'], key=f"filter_in_{column}")
+                    if values:
+                        filters.append((column, 'in', tuple(values)))
+                elif info['kind'] == 'numeriek':
+                    col1, col2 = st.columns(2)
+                    with col1:
+                        low = st.number_input(f"{column} vanaf", value=float(info['min']), key=f"filter_low_{column}")
+                    with col2:
+                        high = st.number_input(f"{column} tot en met", value=float(info['max']), key=f"filter_high_{column}")
+                    if low > info['min'] or high < info['max']:
+                        filters.append((column, 'between', (low, high)))
+                elif info['kind'] == 'datum':
+                    period = st.date_input(f"{column}", value=(info['min'].date(), info['max'].date()),
+                                           key=f"filter_date_{column}")
+                    if len(period) == 2:
+                        low = pd.Timestamp(period[0])
+                        high = pd.Timestamp(period[1]) + pd.Timedelta(days=1) - pd.Timedelta(1)
+                        if low > info['min'] or high < info['max']:
+                            filters.append((column, 'between', (low, high)))
+                else:
+                    text = st.text_input(f"{column} bevat", key=f"filter_text_{column}")
+                    if text:
+                        filters.append((column, 'contains', text))
+
+        sort_column = None if sort_choice == "(geen)" else sort_choice
+        ascending = sort_direction == "Oplopend"
+
+        col1, col2 = st.columns(2)
+        with col1:
+            page_size = st.selectbox("Rijen per pagina", [50, 100, 250, 500], index=1)
+        with col2:
+            page_count = max(1, -(-count_rows(browse_index, filters) // page_size))
+            page = st.number_input("Pagina", min_value=1, max_value=page_count, value=1)
+
+        page_df, total_rows, page_count = browse_page(
+            browse_index, filters, sort_column, ascending,
+            page=page, page_size=page_size, columns=selected_columns
+        )
+
+        # Alleen de zichtbare pagina gaat naar de browser
+        st.dataframe(page_df, use_container_width=True)
+        first_row = (page - 1) * page_size
+        st.caption(f"Rijen {first_row + 1 if total_rows else 0}–{first_row + len(page_df)} "
+                   f"van {total_rows} (pagina {page} van {page_count})")
+
+        if st.button("Exporteer gefilterde data", use_container_width=True):
+            export_df = filtered_frame(browse_index, filters, sort_column, ascending, columns=selected_columns)
+            buffer = io.BytesIO()
+            if len(export_df) < EXCEL_MAX_ROWS:
+                with pd.ExcelWriter(buffer, engine='openpyxl') as writer:
+                    export_df.to_excel(writer, index=False)
+                file_name = f"gefilterde_data_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
+                mime = "application/vnd.ms-excel"
+            else:
+                # Excel ondersteunt maximaal ruim een miljoen rijen, val terug op CSV
+                buffer.write(export_df.to_csv(index=False).encode())
+                file_name = f"gefilterde_data_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
+                mime = "text/csv"
+            buffer.seek(0)
+
+            st.download_button(
+                label="Download Gefilterde Data",
+                data=buffer,
+                file_name=file_name,
+                mime=mime
+            )
+
+elif modus == "Scenario Bibliotheek":
+    st.header("📚 Scenario Bibliotheek")
+
+    scenarios = load_scenario_library()
+
+    if not scenarios:
+        st.info("Er zijn nog geen scenario's opgeslagen. Sla een scenario op vanuit de Prijscalculator.")
+    else:
+        with st.expander(f"🗂️ Opgeslagen scenario's ({len(scenarios)})", expanded=False):
+            overview_df = pd.DataFrame([
+                {'Scenario': scenario['name'], 'Opgeslagen': scenario['timestamp'], **load_scenario(scenario)}
+                for scenario in scenarios
+            ])
+            st.dataframe(overview_df, use_container_width=True)
+
+            to_delete = st.multiselect("Scenario's verwijderen", [scenario['name'] for scenario in scenarios])
+            if to_delete and st.button("Verwijder geselecteerde scenario's"):
+                scenarios = [scenario for scenario in scenarios if scenario['name'] not in to_delete]
+                save_scenario_library(scenarios)
+                st.success(f"{len(to_delete)} scenario('s) verwijderd")
+
+        st.subheader("Ordervolumes")
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            volume_start = st.number_input("Vanaf (orders)", min_value=1, value=100)
+        with col2:
+            volume_end = st.number_input("Tot en met (orders)", min_value=1, value=20000)
+        with col3:
+            volume_count = st.number_input("Aantal klantgroottes", min_value=1, max_value=500, value=50)
+
+        volumes = np.unique(np.linspace(volume_start, max(volume_start, volume_end), volume_count).round().astype(int))
+
+        selected_names = st.multiselect(
+            "Te vergelijken scenario's",
+            [scenario['name'] for scenario in scenarios],
+            default=[scenario['name'] for scenario in scenarios]
+        )
+        selected_scenarios = [scenario for scenario in scenarios if scenario['name'] in selected_names]
+
+        if selected_scenarios:
+            st.subheader("Vergelijking van Scenario's")
+            comparison_df = scenario_comparison_df(selected_scenarios, volumes)
+            st.dataframe(comparison_df, use_container_width=True)
+
+            buffer = io.BytesIO()
+            with pd.ExcelWriter(buffer, engine='openpyxl') as writer:
+                comparison_df.to_excel(writer, index=False)
+            buffer.seek(0)
+
+            st.download_button(
+                label="Download Vergelijking als Excel",
+                data=buffer,
+                file_name=f"scenario_vergelijking_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx",
+                mime="application/vnd.ms-excel"
+            )
+
+elif modus == "Portefeuille Impact":
+    st.header("💶 Portefeuille Impact")
+    st.markdown("Bereken per klant de kosten onder het huidige en het voorgestelde tarief en de omzetverschuiving per segment.")
+
+    uploaded_file = st.file_uploader("Upload een klantbestand met ordervolumes (Excel of CSV)", type=['xlsx', 'xls', 'csv'])
+
+    if uploaded_file is not None:
+        customers_df = get_browse_index(uploaded_file)['frame']
+        numeric_columns = [column for column in customers_df.columns if pd.api.types.is_numeric_dtype(customers_df[column])]
+
+        if not numeric_columns:
+            st.warning("Het bestand bevat geen numerieke kolom met ordervolumes.")
+        else:
+            col1, col2 = st.columns(2)
+            with col1:
+                volume_column = st.selectbox("Kolom met ordervolume", numeric_columns)
+            with col2:
+                segment_columns = st.multiselect(
+                    "Segmenteer op", [column for column in customers_df.columns if column != volume_column]
+                )
+
+            scenarios = load_scenario_library()
+            with st.expander("⚙️ Tarieven", expanded=True):
+                col1, col2 = st.columns(2)
+                with col1:
+                    current_tariff = tariff_inputs("Huidig Tarief", "current", scenarios)
+                with col2:
+                    proposed_tariff = tariff_inputs("Voorgesteld Tarief", "proposed", scenarios)
+
+            if st.button("Bereken Impact", use_container_width=True):
+                customer_df, segment_df, impact_summary = portfolio_impact(
+                    customers_df, volume_column, tariff_to_cents(current_tariff),
+                    tariff_to_cents(proposed_tariff), segment_columns
+                )
+
+                revenue_delta = impact_summary['revenue_delta']
+                col1, col2, col3 = st.columns(3)
+                with col1:
+                    st.metric("Huidige Omzet", format_cents(impact_summary['current_revenue'], thousands=True))
+                with col2:
+                    st.metric("Nieuwe Omzet", format_cents(impact_summary['proposed_revenue'], thousands=True),
+                              ('+' if revenue_delta >= 0 else '') + format_cents(revenue_delta, thousands=True))
+                with col3:
+                    st.metric("Klanten met Stijging",
+                              f"{impact_summary['customers_with_increase']} van {impact_summary['customers']}")
+
+                st.subheader("Impact per Segment")
+                st.dataframe(segment_df, use_container_width=True)
+
+                st.subheader("Grootste Stijgingen")
+                delta_column = impact_summary['columns']['Verschil']
+                st.dataframe(customer_df.nlargest(20, delta_column), use_container_width=True)
+
+                st.subheader("Grootste Dalingen")
+                st.dataframe(customer_df.nsmallest(20, delta_column), use_container_width=True)
+
+                buffer = io.BytesIO()
+                with pd.ExcelWriter(buffer, engine='openpyxl') as writer:
+                    segment_df.to_excel(writer, index=False)
+                buffer.seek(0)
+
+                st.download_button(
+                    label="Download Impact per Segment als Excel",
+                    data=buffer,
+                    file_name=f"portefeuille_impact_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx",
+                    mime="application/vnd.ms-excel"
+                )
+
+elif modus == "Tarief Optimalisatie":
+    st.header("🎯 Tarief Optimalisatie")
+    st.markdown("Zoek bundelprijzen die een omzetdoel halen zonder dat klanten te veel extra gaan betalen.")
+
+    uploaded_file = st.file_uploader("Upload een klantbestand met ordervolumes (Excel of CSV)", type=['xlsx', 'xls', 'csv'])
+
+    if uploaded_file is not None:
+        customers_df = get_browse_index(uploaded_file)['frame']
+        numeric_columns = [column for column in customers_df.columns if pd.api.types.is_numeric_dtype(customers_df[column])]
+
+        if not numeric_columns:
+            st.warning("Het bestand bevat geen numerieke kolom met ordervolumes.")
+        else:
+            volume_column = st.selectbox("Kolom met ordervolume", numeric_columns)
+
+            with st.expander("⚙️ Huidig Tarief", expanded=False):
+                current_tariff = tariff_inputs("Huidig Tarief", "optimizer", load_scenario_library())
+
+            with st.expander("🎯 Zoekruimte en Randvoorwaarden", expanded=True):
+                varied_parameters = st.multiselect(
+                    "Te optimaliseren parameters",
+                    list(TARIFF_PARAMETERS),
+                    default=['big_start_cost', 'small_prepaid_cost', 'big_prepaid_cost', 'overage_cost'],
+                    format_func=lambda name: TARIFF_PARAMETER_LABELS[name]
+                )
+
+                col1, col2 = st.columns(2)
+                with col1:
+                    n_candidates = st.number_input("Aantal kandidaat-tarieven", min_value=10, max_value=100000, value=5000, step=500)
+                    variation = st.slider("Maximale afwijking per parameter (%)", 1, 100, 25)
+                    target_change = st.number_input("Omzetdoel t.o.v. huidig (%)", value=0.0, step=0.5)
+                with col2:
+                    revenue_tolerance = st.number_input("Toegestane afwijking van omzetdoel (± %)", min_value=0.0, value=2.0, step=0.5)
+                    max_increase = st.number_input("Maximale stijging per klant (%)", min_value=0.0, value=10.0, step=1.0)
+                    seed = st.number_input("Seed", min_value=0, value=42)
+
+            if st.button("Start Optimalisatie", use_container_width=True):
+                with st.spinner("Kandidaat-tarieven worden geëvalueerd..."):
+                    results_df = optimize_tariff(
+                        customers_df[volume_column], tariff_to_cents(current_tariff), varied_parameters,
+                        n_candidates=int(n_candidates), variation=variation / 100,
+                        target_change=target_change, revenue_tolerance=revenue_tolerance,
+                        max_increase=max_increase, seed=int(seed)
+                    )
+
+                feasible_df = results_df[results_df['Voldoet']]
+                st.metric("Haalbare Tarieven", f"{len(feasible_df)} van {len(results_df)}")
+
+                if feasible_df.empty:
+                    st.warning("Geen enkel kandidaat-tarief voldoet. Verruim de randvoorwaarden of vergroot de zoekruimte.")
+                else:
+                    st.subheader("Beste Tarieven")
+                    st.dataframe(feasible_df.head(50), use_container_width=True)
+
+                buffer = io.BytesIO()
+                with pd.ExcelWriter(buffer, engine='openpyxl') as writer:
+                    results_df.to_excel(writer, index=False)
+                buffer.seek(0)
+
+                st.download_button(
+                    label="Download Alle Kandidaten als Excel",
+                    data=buffer,
+                    file_name=f"tarief_optimalisatie_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx",
+                    mime="application/vnd.ms-excel"
+                )
+
+elif modus == "Bundelplanner":
+    st.header("🗓️ Bundelplanner")
+    st.markdown("Plan de aankoop van start- en prepaid bundels over een contractperiode op basis van volumes per maand of dag.")
+
+    uploaded_file = st.file_uploader("Upload een bestand met één rij per klant en één kolom per periode (Excel of CSV)",
+                                     type=['xlsx', 'xls', 'csv'])
+
+    if uploaded_file is not None:
+        series_df = get_browse_index(uploaded_file)['frame']
+        numeric_columns = [column for column in series_df.columns if pd.api.types.is_numeric_dtype(series_df[column])]
+
+        col1, col2 = st.columns(2)
+        with col1:
+            customer_column = st.selectbox("Klantkolom", ["(rijnummer)"] + list(series_df.columns))
+        with col2:
+            period_columns = st.multiselect(
+                "Periodekolommen (in volgorde)",
+                [column for column in numeric_columns if column != customer_column],
+                default=[column for column in numeric_columns if column != customer_column]
+            )
+
+        with st.expander("⚙️ Tarief", expanded=False):
+            planner_tariff = tariff_inputs("Tarief", "planner", load_scenario_library())
+
+        contract_periods = st.number_input("Contractduur (perioden)", min_value=1,
+                                           value=max(len(period_columns), 1),
+                                           help="Gebruikt voor de prognose bij de keuze van startbundel en prepaids")
+
+        if period_columns:
+            # Ontbrekende of negatieve volumes tellen als 0 orders
+            volume_matrix = np.ceil(series_df[period_columns].fillna(0).clip(lower=0).to_numpy(dtype=float)).astype(np.int64)
+            if customer_column == "(rijnummer)":
+                customer_labels = np.arange(1, len(series_df) + 1)
+            else:
+                customer_labels = series_df[customer_column].astype(str).to_numpy()
+
+            tariff = tariff_to_cents(planner_tariff)
+            plans_df, plan_totals = batch_purchase_plans_df(tariff, volume_matrix, contract_periods, customer_labels)
+
+            col1, col2 = st.columns(2)
+            with col1:
+                st.metric("Kosten Planner (alle klanten)", format_cents(plan_totals['planner_cost'], thousands=True))
+            with col2:
+                st.metric("Verschil t.o.v. Eenmalige Aankoop",
+                          format_cents(plan_totals['planner_cost'] - plan_totals['one_off_cost'], thousands=True))
+
+            st.subheader("Samenstelling per Klant")
+            st.dataframe(plans_df, use_container_width=True)
+
+            st.subheader("Aankoopschema")
+            customer_position = st.selectbox(
+                "Klant", range(len(customer_labels)), format_func=lambda position: str(customer_labels[position])
+            )
+            schedule_df = purchase_schedule_df(
+                tariff, volume_matrix[customer_position], contract_periods,
+                period_labels=[str(column) for column in period_columns]
+            )
+            st.dataframe(schedule_df, use_container_width=True)
+            st.line_chart(schedule_df.set_index('Periode')['Cumulatieve Kosten'])
+
+            buffer = io.BytesIO()
+            with pd.ExcelWriter(buffer, engine='openpyxl') as writer:
+                plans_df.to_excel(writer, index=False, sheet_name='Klanten')
+                schedule_df.to_excel(writer, index=False, sheet_name='Aankoopschema')
+            buffer.seek(0)
+
+            st.download_button(
+                label="Download Planning als Excel",
+                data=buffer,
+                file_name=f"bundelplanning_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx",
+                mime="application/vnd.ms-excel"
+            )
 
 # Footer
 st.markdown("---")
@@ -1,11 +1,63 @@
 import pandas as pd
 import numpy as np
 import itertools
-import matplotlib.pyplot as plt
 import plotly.express as px
 import plotly.graph_objects as go
 import io
+import os
+import json
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
 import base64
+from datetime import datetime
+
+# Parameters van het tariefmodel uit de prijscalculator, in vaste volgorde
+TARIFF_PARAMETERS = (
+    'small_start_cost', 'small_start_orders',
+    'big_start_cost', 'big_start_orders',
+    'small_prepaid_cost', 'small_prepaid_orders',
+    'big_prepaid_cost', 'big_prepaid_orders',
+    'overage_cost'
+)
+
+# Tariefparameters die een geldbedrag zijn; de engine rekent deze in hele centen (int64)
+TARIFF_MONEY_PARAMETERS = (
+    'small_start_cost', 'big_start_cost',
+    'small_prepaid_cost', 'big_prepaid_cost',
+    'overage_cost'
+)
+
+# Leesbare namen van de tariefparameters voor tabellen
+TARIFF_PARAMETER_LABELS = {
+    'small_start_cost': 'Small Start Kosten',
+    'small_start_orders': 'Small Start Orders',
+    'big_start_cost': 'Big Start Kosten',
+    'big_start_orders': 'Big Start Orders',
+    'small_prepaid_cost': 'Small Prepaid Kosten',
+    'small_prepaid_orders': 'Small Prepaid Orders',
+    'big_prepaid_cost': 'Big Prepaid Kosten',
+    'big_prepaid_orders': 'Big Prepaid Orders',
+    'overage_cost': 'Overage Kosten'
+}
+
+# Strategienamen, geïndexeerd met de codes van calculate_costs_vectorized
+STRATEGY_NAMES = ("Small Start", "Small Start + Prepaids", "Big Start", "Big Start + Prepaids")
+
+# Standaard locatie van de lokale scenario bibliotheek
+SCENARIO_LIBRARY_FILE = 'scenarios.json'
+
+# Portefeuille analyses: rijen per chunk
+PORTFOLIO_CHUNK_SIZE = 1_000_000
+
+# Tariefoptimalisatie: maximaal aantal (kandidaat x volume) cellen per batch
+OPTIMIZER_BATCH_ELEMENTS = 2_000_000
+
+# Bundelplanner: aantal perioden per stap in batch_purchase_plans_df
+PLANNER_PERIOD_CHUNK = 64
+
+# Afronding van kandidaat-tarieven in centen (bundelprijzen op hele euro's, overage op 10 cent)
+CANDIDATE_ROUNDING_CENTS = {'overage_cost': 10}
+DEFAULT_ROUNDING_CENTS = 100
 
 # Functies voor prijsberekeningen
 def calculate_costs(orders, start_bundles, prepaid_bundles, overage_cost):
@@ -375,6 +427,127 @@ def load_scenario(scenario):
     """Laadt een scenario dictionary terug naar parameters"""
     return scenario['parameters']
 
+def to_cents(amount):
+    """Zet een bedrag in euro's (scalar of array) om naar hele centen"""
+    cents = np.round(np.asarray(amount, dtype=float) * 100).astype(np.int64)
+    return int(cents) if cents.ndim == 0 else cents
+
+def from_cents(cents):
+    """Zet centen om naar euro's; alleen voor weergave en export"""
+    return cents / 100
+
+def format_cents(cents, thousands=False):
+    """Formatteert een bedrag in centen exact als euro's, bijvoorbeeld 123456 -> '€1234.56'"""
+    cents = int(cents)
+    sign = '-' if cents < 0 else ''
+    euros, rest = divmod(abs(cents), 100)
+    euros = f"{euros:,}" if thousands else f"{euros}"
+    return f"{sign}€{euros}.{rest:02d}"
+
+def tariff_to_cents(tariff):
+    """Zet de geldbedragen van een tarief in euro's om naar centen en orderaantallen naar gehele getallen"""
+    return {
+        name: to_cents(tariff[name]) if name in TARIFF_MONEY_PARAMETERS else int(tariff[name])
+        for name in TARIFF_PARAMETERS
+    }
+
+def load_scenario_library(path=SCENARIO_LIBRARY_FILE):
+    """Laadt de lokaal opgeslagen scenario's, of een lege lijst als er nog geen bibliotheek is"""
+    if not os.path.exists(path):
+        return []
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+def save_scenario_library(scenarios, path=SCENARIO_LIBRARY_FILE):
+    """Schrijft de scenario bibliotheek weg; via een tijdelijk bestand zodat een crash niets corrumpeert"""
+    temp_path = path + '.tmp'
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(scenarios, f, indent=2, ensure_ascii=False)
+    os.replace(temp_path, path)
+
+def add_scenario_to_library(scenarios, scenario):
+    """Voegt een scenario toe aan de bibliotheek; een bestaand scenario met dezelfde naam wordt vervangen"""
+    return [s for s in scenarios if s['name'] != scenario['name']] + [scenario]
+
+def calculate_costs_vectorized(orders, small_start_cost, small_start_orders,
+                               big_start_cost, big_start_orders,
+                               small_prepaid_cost, small_prepaid_orders,
+                               big_prepaid_cost, big_prepaid_orders,
+                               overage_cost):
+    """
+    Vectorized versie van calculate_costs uit de prijscalculator.
+    
+    Alle argumenten mogen scalars of NumPy arrays zijn en worden tegen elkaar
+    gebroadcast, bijvoorbeeld orders met vorm (V,) en parameters met vorm (S, 1)
+    voor S tarieven tegen V ordervolumes in één berekening. Geldbedragen zijn
+    gehele centen, zodat alle rekenwerk en vergelijkingen exact in int64 gebeuren.
+    
+    Returns:
+    - total_cost: Array met minimale kosten in centen
+    - strategy: Array met strategiecodes (index in STRATEGY_NAMES)
+    """
+    orders = np.asarray(orders)
+    
+    # Optie 1: Small start aangevuld met (naar boven afgeronde) small prepaids
+    remaining_after_small = np.maximum(orders - small_start_orders, 0)
+    small_prepaids_needed = -(-remaining_after_small // small_prepaid_orders)
+    small_total = small_start_cost + small_prepaids_needed * small_prepaid_cost
+    
+    # Optie 2: Big start met volledige big prepaids en de rest als overage
+    remaining_after_big = np.maximum(orders - big_start_orders, 0)
+    big_prepaids_needed = remaining_after_big // big_prepaid_orders
+    overage_orders = remaining_after_big - big_prepaids_needed * big_prepaid_orders
+    big_total = big_start_cost + big_prepaids_needed * big_prepaid_cost + overage_orders * overage_cost
+    
+    # Zelfde keuzes en gelijkspelregels als calculate_costs
+    small_only = orders <= small_start_orders
+    small_wins = small_total < big_total
+    total_cost = np.where(small_only, small_start_cost, np.where(small_wins, small_total, big_total))
+    strategy = np.where(small_only, 0, np.where(small_wins, 1, np.where(orders <= big_start_orders, 2, 3)))
+    
+    return total_cost, strategy
+
+def stack_scenario_parameters(scenarios):
+    """Stapelt de tariefparameters van alle scenario's (in centen) tot kolomvectoren met vorm (S, 1)"""
+    parameters = [tariff_to_cents(load_scenario(scenario)) for scenario in scenarios]
+    return {
+        name: np.array([p[name] for p in parameters], dtype=np.int64).reshape(-1, 1)
+        for name in TARIFF_PARAMETERS
+    }
+
+def evaluate_scenarios(scenarios, volumes):
+    """
+    Evalueert alle scenario's tegen dezelfde ordervolumes in één batch.
+    
+    Returns:
+    - costs: Array (S, V) met kosten in centen per scenario en volume
+    - strategies: Array (S, V) met strategiecodes
+    """
+    volumes = np.asarray(volumes, dtype=np.int64).reshape(1, -1)
+    return calculate_costs_vectorized(volumes, **stack_scenario_parameters(scenarios))
+
+def scenario_comparison_df(scenarios, volumes):
+    """Genereert een gerangschikte vergelijkingstabel van scenario's over de gegeven ordervolumes"""
+    volumes = np.asarray(volumes)
+    costs, _ = evaluate_scenarios(scenarios, volumes)
+    total_costs = costs.sum(axis=1)
+    
+    # Rangschikken gebeurt exact op centen; euro's pas in de tabel
+    df = pd.DataFrame({
+        'Scenario': [scenario['name'] for scenario in scenarios],
+        'Opgeslagen': [scenario['timestamp'] for scenario in scenarios],
+        'Totale Kosten': from_cents(total_costs),
+        'Gem. Kosten per Order': from_cents(total_costs / volumes.sum()),
+        'Min. Kosten': from_cents(costs.min(axis=1)),
+        'Max. Kosten': from_cents(costs.max(axis=1))
+    })
+    per_volume = pd.DataFrame(from_cents(costs), columns=[f"{v} orders" for v in volumes])
+    df = pd.concat([df, per_volume], axis=1)
+    
+    df = df.iloc[np.argsort(total_costs, kind='stable')].reset_index(drop=True)
+    df.insert(0, 'Rang', np.arange(1, len(df) + 1))
+    return df
+
 def calculate_marginal_cost(orders, start_bundles, prepaid_bundles, overage_cost, step=100):
     """Berekent marginale kosten voor verschillende ordervolumes"""
     results = []
@@ -394,3 +567,415 @@ def calculate_marginal_cost(orders, start_bundles, prepaid_bundles, overage_cost
         })
     
     return pd.DataFrame(results)
+
+def portfolio_costs(volumes, tariff):
+    """Berekent de kosten per klant in centen voor een tarief, in chunks over de volumes"""
+    volumes = np.asarray(volumes)
+    costs = np.empty(len(volumes), dtype=np.int64)
+    for start in range(0, len(volumes), PORTFOLIO_CHUNK_SIZE):
+        chunk = volumes[start:start + PORTFOLIO_CHUNK_SIZE]
+        costs[start:start + len(chunk)], _ = calculate_costs_vectorized(chunk, **tariff)
+    return costs
+
+def _free_column_name(name, taken):
+    """Geeft name terug, of name met het achtervoegsel '(berekend)' als die kolomnaam al bestaat"""
+    candidate = name
+    suffix = 1
+    while candidate in taken:
+        candidate = f"{name} (berekend)" if suffix == 1 else f"{name} (berekend {suffix})"
+        suffix += 1
+    return candidate
+
+def portfolio_impact(df, volume_column, current_tariff, proposed_tariff, segment_columns=()):
+    """
+    Berekent de omzetimpact van een tariefwijziging over alle klanten.
+    
+    Parameters:
+    - df: DataFrame met één rij per klant
+    - volume_column: Kolom met het aantal orders per klant
+    - current_tariff: Dictionary met de huidige tariefparameters in centen (zie tariff_to_cents)
+    - proposed_tariff: Dictionary met de voorgestelde tariefparameters in centen
+    - segment_columns: Kolommen waarop de impact gegroepeerd wordt
+    
+    Returns:
+    - customer_df: Klantgegevens aangevuld met de kosten onder beide tarieven en het verschil (in euro's)
+    - segment_df: Geaggregeerde omzetverschuiving per segment (in euro's)
+    - summary: Dictionary met 'columns', de werkelijke namen van de berekende klantkolommen
+      (een bestaande kolom met dezelfde naam wordt nooit overschreven), het aantal klanten en
+      de exacte totalen 'current_revenue', 'proposed_revenue' en 'revenue_delta' in centen
+    """
+    # Ontbrekende of negatieve volumes tellen als 0 orders; deelorders ronden we naar boven af
+    volumes = np.ceil(pd.to_numeric(df[volume_column], errors='coerce').fillna(0).clip(lower=0).to_numpy())
+    volumes = volumes.astype(np.int64)
+    
+    # Beide tarieven één keer per uniek volume doorrekenen en terugzetten per klant
+    unique_volumes, customer_volume = np.unique(volumes, return_inverse=True)
+    current_costs = portfolio_costs(unique_volumes, current_tariff)[customer_volume]
+    proposed_costs = portfolio_costs(unique_volumes, proposed_tariff)[customer_volume]
+    
+    delta = proposed_costs - current_costs
+    with np.errstate(divide='ignore', invalid='ignore'):
+        delta_pct = np.where(current_costs > 0, delta / current_costs * 100, np.nan)
+    
+    # Aggregeren gebeurt in centen op een apart frame, los van de kolommen van de upload
+    computed = pd.DataFrame({
+        'orders': volumes,
+        'current': current_costs,
+        'proposed': proposed_costs,
+        'delta': delta,
+        'delta_pct': delta_pct,
+        'increase': delta > 0,
+        'decrease': delta < 0
+    }, index=df.index)
+    aggregations = {
+        'Klanten': ('orders', 'size'),
+        'Orders': ('orders', 'sum'),
+        'Huidige Omzet': ('current', 'sum'),
+        'Nieuwe Omzet': ('proposed', 'sum'),
+        'Verschil': ('delta', 'sum'),
+        'Klanten met Stijging': ('increase', 'sum'),
+        'Klanten met Daling': ('decrease', 'sum'),
+        'Max. Stijging %': ('delta_pct', 'max')
+    }
+    if segment_columns:
+        # Resultaatkolommen mogen niet botsen met de namen van de segmentkolommen
+        aggregations = {
+            _free_column_name(name, segment_columns): aggregation for name, aggregation in aggregations.items()
+        }
+        keys = [df[column] for column in segment_columns]
+        segment_df = computed.groupby(keys, observed=True, dropna=False).agg(**aggregations).reset_index()
+    else:
+        # Eén constante groepssleutel in plaats van een Python functie per rij
+        keys = np.zeros(len(computed), dtype=np.int8)
+        segment_df = computed.groupby(keys).agg(**aggregations).reset_index(drop=True)
+        segment_df.insert(0, 'Segment', 'Totaal')
+    
+    segment_names = dict(zip(
+        ('Klanten', 'Orders', 'Huidige Omzet', 'Nieuwe Omzet', 'Verschil', 'Klanten met Stijging',
+         'Klanten met Daling', 'Max. Stijging %'),
+        aggregations
+    ))
+    revenue_column = segment_names['Huidige Omzet']
+    delta_column = segment_names['Verschil']
+    with np.errstate(divide='ignore', invalid='ignore'):
+        segment_df[_free_column_name('Verschil %', segment_df.columns)] = np.where(
+            segment_df[revenue_column] > 0, segment_df[delta_column] / segment_df[revenue_column] * 100, np.nan
+        )
+    
+    # Sommeren is exact gebeurd in centen; pas nu omzetten naar euro's
+    for name in ('Huidige Omzet', 'Nieuwe Omzet', 'Verschil'):
+        segment_df[segment_names[name]] = from_cents(segment_df[segment_names[name]])
+    
+    customer_df = df.copy(deep=False)
+    columns = {}
+    for name, values in (('Orders', volumes), ('Huidige Kosten', from_cents(current_costs)),
+                         ('Nieuwe Kosten', from_cents(proposed_costs)), ('Verschil', from_cents(delta)),
+                         ('Verschil %', delta_pct)):
+        columns[name] = _free_column_name(name, customer_df.columns)
+        customer_df[columns[name]] = values
+    
+    summary = {
+        'columns': columns,
+        'customers': len(volumes),
+        'customers_with_increase': int(np.count_nonzero(delta > 0)),
+        'current_revenue': int(current_costs.sum()),
+        'proposed_revenue': int(proposed_costs.sum()),
+        'revenue_delta': int(delta.sum())
+    }
+    return customer_df, segment_df, summary
+
+def volume_distribution(volumes):
+    """Comprimeert klantvolumes tot unieke volumes met het aantal klanten per volume"""
+    volumes = np.ceil(pd.to_numeric(pd.Series(volumes), errors='coerce').fillna(0).clip(lower=0).to_numpy())
+    return np.unique(volumes.astype(np.int64), return_counts=True)
+
+def sample_tariff_candidates(base_tariff, n_candidates, varied_parameters, variation=0.25, seed=None):
+    """
+    Trekt willekeurige kandidaat-tarieven rond een basistarief.
+    
+    Elke gevarieerde parameter wordt uniform getrokken binnen ±variation van de
+    basiswaarde (in centen, zie tariff_to_cents); bundelprijzen worden op hele
+    euro's afgerond, de overage prijs op 10 cent en orderaantallen op gehele
+    orders. Kandidaat 0 is altijd het basistarief.
+    
+    Returns:
+    - Dictionary met per parameter een int64 array met vorm (n_candidates,)
+    """
+    rng = np.random.default_rng(seed)
+    candidates = {}
+    for name in TARIFF_PARAMETERS:
+        base = int(base_tariff[name])
+        values = np.full(n_candidates, base, dtype=np.int64)
+        if name in varied_parameters:
+            step = CANDIDATE_ROUNDING_CENTS.get(name, DEFAULT_ROUNDING_CENTS) if name in TARIFF_MONEY_PARAMETERS else 1
+            sampled = base * (1 + rng.uniform(-variation, variation, n_candidates - 1))
+            values[1:] = np.round(sampled / step).astype(np.int64) * step
+        if name.endswith('_orders'):
+            values = np.maximum(values, 1)
+        candidates[name] = np.maximum(values, 0)
+    return candidates
+
+def tariff_monotone_mask(candidates):
+    """
+    Controleert per kandidaat of de prijs per order daalt naarmate de bundel groter wordt.
+    
+    Overage is het duurst per order, daarna small prepaid en dan big prepaid;
+    de big start mag per order niet duurder zijn dan de small start. Prijzen per
+    order worden kruiselings vermenigvuldigd vergeleken, zodat de toets exact is.
+    """
+    c = candidates
+    return (
+        (c['small_start_orders'] < c['big_start_orders'])
+        & (c['big_start_cost'] * c['small_start_orders'] <= c['small_start_cost'] * c['big_start_orders'])
+        & (c['big_prepaid_cost'] * c['small_prepaid_orders'] <= c['small_prepaid_cost'] * c['big_prepaid_orders'])
+        & (c['small_prepaid_cost'] <= c['overage_cost'] * c['small_prepaid_orders'])
+    )
+
+def evaluate_tariff_batch(batch):
+    """
+    Evalueert een batch kandidaat-tarieven tegen een klantvolumeverdeling.
+    
+    Module-niveau functie zodat hij in een ProcessPoolExecutor gebruikt kan worden.
+    batch is een tuple (candidates, volumes, counts, current_costs).
+    """
+    candidates, volumes, counts, current_costs = batch
+    parameters = {name: values.reshape(-1, 1) for name, values in candidates.items()}
+    costs, _ = calculate_costs_vectorized(volumes.reshape(1, -1), **parameters)
+    
+    with np.errstate(divide='ignore', invalid='ignore'):
+        increase_pct = np.where(current_costs > 0, (costs - current_costs) / current_costs * 100, 0.0)
+    
+    return {
+        'revenue': costs @ counts,
+        'max_increase_pct': increase_pct.max(axis=1),
+        'customers_with_increase': (costs > current_costs) @ counts
+    }
+
+def optimize_tariff(volumes, current_tariff, varied_parameters, n_candidates=5000, variation=0.25,
+                    target_change=0.0, revenue_tolerance=2.0, max_increase=10.0, workers=None, seed=None):
+    """
+    Zoekt tarieven die een omzetdoel halen binnen de gestelde randvoorwaarden.
+    
+    Parameters:
+    - volumes: Ordervolumes per klant
+    - current_tariff: Dictionary met de huidige tariefparameters in centen (zie tariff_to_cents)
+    - varied_parameters: Parameters die de zoektocht mag aanpassen
+    - n_candidates: Aantal te evalueren kandidaat-tarieven
+    - variation: Maximale relatieve afwijking per parameter (0.25 = ±25%)
+    - target_change: Gewenste omzetverandering in procenten
+    - revenue_tolerance: Toegestane afwijking van het omzetdoel in procentpunten
+    - max_increase: Maximale kostenstijging per klant in procenten
+    - workers: Aantal processen; 1 evalueert zonder process pool
+    - seed: Seed voor reproduceerbare kandidaten
+    
+    Returns:
+    - DataFrame met alle kandidaten, haalbare eerst en gesorteerd op afstand tot het doel
+    """
+    unique_volumes, counts = volume_distribution(volumes)
+    current_costs, _ = calculate_costs_vectorized(unique_volumes, **current_tariff)
+    current_revenue = current_costs @ counts
+    
+    candidates = sample_tariff_candidates(current_tariff, n_candidates, varied_parameters, variation, seed)
+    
+    # Batches zo groot dat de kostenmatrix per batch binnen het geheugenbudget blijft
+    batch_size = max(1, OPTIMIZER_BATCH_ELEMENTS // max(1, len(unique_volumes)))
+    batches = [
+        ({name: values[start:start + batch_size] for name, values in candidates.items()},
+         unique_volumes, counts, current_costs)
+        for start in range(0, n_candidates, batch_size)
+    ]
+    
+    if workers == 1 or len(batches) == 1:
+        results = [evaluate_tariff_batch(batch) for batch in batches]
+    else:
+        # Spawn in plaats van fork: de Streamlit server is multi-threaded
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn')) as pool:
+            results = list(pool.map(evaluate_tariff_batch, batches))
+    
+    revenue = np.concatenate([result['revenue'] for result in results])
+    max_increase_pct = np.concatenate([result['max_increase_pct'] for result in results])
+    customers_with_increase = np.concatenate([result['customers_with_increase'] for result in results])
+    
+    revenue_change = (revenue - current_revenue) / current_revenue * 100 if current_revenue > 0 else np.zeros(n_candidates)
+    target_distance = np.abs(revenue_change - target_change)
+    feasible = (
+        tariff_monotone_mask(candidates)
+        & (target_distance <= revenue_tolerance)
+        & (max_increase_pct <= max_increase)
+    )
+    
+    df = pd.DataFrame({
+        TARIFF_PARAMETER_LABELS[name]: from_cents(candidates[name]) if name in TARIFF_MONEY_PARAMETERS else candidates[name]
+        for name in TARIFF_PARAMETERS
+    })
+    df.insert(0, 'Kandidaat', np.arange(n_candidates))
+    df['Omzet'] = from_cents(revenue)
+    df['Omzetverandering %'] = revenue_change
+    df['Afstand tot Doel'] = target_distance
+    df['Max. Stijging %'] = max_increase_pct
+    df['Klanten met Stijging'] = customers_with_increase
+    df['Voldoet'] = feasible
+    
+    return df.sort_values(
+        ['Voldoet', 'Afstand tot Doel', 'Max. Stijging %'], ascending=[False, True, True], kind='stable'
+    ).reset_index(drop=True)
+
+def start_purchase_plans(n_customers, contract_periods):
+    """
+    Maakt de begintoestand van de bundelplanner voor een batch klanten.
+    
+    De toestand bevat alles wat in eerdere perioden is vastgelegd (startbundel,
+    resterend tegoed, gekochte bundels en kosten); extend_purchase_plans beslist
+    alleen over nieuwe perioden en werkt deze toestand bij.
+    
+    Parameters:
+    - n_customers: Aantal klanten
+    - contract_periods: Verwachte contractduur in perioden, gebruikt voor de prognose
+    """
+    return {
+        'contract_periods': contract_periods,
+        'periods': 0,
+        'big_start': np.zeros(n_customers, dtype=bool),
+        'credit': np.zeros(n_customers, dtype=np.int64),
+        'orders': np.zeros(n_customers, dtype=np.int64),
+        'cost': np.zeros(n_customers, dtype=np.int64),
+        'big_prepaids': np.zeros(n_customers, dtype=np.int64),
+        'small_prepaids': np.zeros(n_customers, dtype=np.int64),
+        'overage_orders': np.zeros(n_customers, dtype=np.int64)
+    }
+
+def extend_purchase_plans(tariff, state, new_volumes):
+    """
+    Plant de aankopen van een batch klanten voor nieuwe perioden, vooruit in de tijd.
+    
+    De planner volgt de bundelregels van calculate_costs: een Small Start wordt
+    aangevuld met small prepaids, een Big Start met volledige big prepaids en
+    overage. Elke beslissing gebruikt alleen de volumes en het tegoed tot en met
+    die periode, dus eerder geplande perioden veranderen nooit als de reeks
+    langer wordt. In de eerste periode kiest de planner de startbundel die de
+    Prijscalculator kiest voor de prognose (volume van die periode maal de
+    contractduur). Raakt het tegoed op, dan koopt een Small Start klant net
+    genoeg small prepaids; een Big Start klant koopt een big prepaid alleen als
+    het tekort plus de verwachte vraag voor de rest van het contract (op basis
+    van het gemiddelde tot nu toe) die volledig vult, en betaalt de rest als overage.
+    
+    Parameters:
+    - tariff: Dictionary met de tariefparameters in centen (zie tariff_to_cents)
+    - state: Toestand uit start_purchase_plans; wordt bijgewerkt
+    - new_volumes: Orders per klant en nieuwe periode, vorm (N, k)
+    
+    Returns:
+    - Dictionary met arrays van vorm (N, k) per nieuwe periode: 'big_prepaids',
+      'small_prepaids', 'overage_orders', 'credit' (tegoed na de periode) en
+      'cost' (kosten van de periode in centen, inclusief een eventuele startbundel)
+    """
+    new_volumes = np.asarray(new_volumes, dtype=np.int64)
+    n_customers, n_periods = new_volumes.shape
+    periods = {name: np.zeros((n_customers, n_periods), dtype=np.int64)
+               for name in ('big_prepaids', 'small_prepaids', 'overage_orders', 'credit', 'cost')}
+    
+    for column in range(n_periods):
+        volumes = new_volumes[:, column]
+        period_cost = np.zeros(n_customers, dtype=np.int64)
+        
+        if state['periods'] == 0:
+            _, strategy = calculate_costs_vectorized(volumes * state['contract_periods'], **tariff)
+            # Strategiecodes 2 en 3 zijn de Big Start varianten
+            state['big_start'] = strategy >= 2
+            state['credit'] = np.where(state['big_start'], tariff['big_start_orders'], tariff['small_start_orders'])
+            period_cost += np.where(state['big_start'], tariff['big_start_cost'], tariff['small_start_cost'])
+        
+        state['periods'] += 1
+        state['orders'] += volumes
+        used = np.minimum(volumes, state['credit'])
+        shortfall = volumes - used
+        state['credit'] -= used
+        big_start = state['big_start']
+        
+        # Small Start: net genoeg small prepaids om het tekort te dekken
+        small_bought = np.where(big_start, 0, -(-shortfall // tariff['small_prepaid_orders']))
+        
+        # Big Start: alleen big prepaids die binnen de verwachte resterende vraag volledig opgaan
+        remaining_periods = max(state['contract_periods'] - state['periods'], 0)
+        expected = -(-state['orders'] * remaining_periods // state['periods'])
+        big_bought = np.where(big_start, np.minimum(
+            -(-shortfall // tariff['big_prepaid_orders']),
+            (shortfall + expected) // tariff['big_prepaid_orders']
+        ), 0)
+        
+        covered = small_bought * tariff['small_prepaid_orders'] + big_bought * tariff['big_prepaid_orders']
+        overage_orders = np.maximum(shortfall - covered, 0)
+        state['credit'] += np.maximum(covered - shortfall, 0)
+        
+        period_cost += (
+            big_bought * tariff['big_prepaid_cost']
+            + small_bought * tariff['small_prepaid_cost']
+            + overage_orders * tariff['overage_cost']
+        )
+        state['cost'] += period_cost
+        state['big_prepaids'] += big_bought
+        state['small_prepaids'] += small_bought
+        state['overage_orders'] += overage_orders
+        
+        periods['big_prepaids'][:, column] = big_bought
+        periods['small_prepaids'][:, column] = small_bought
+        periods['overage_orders'][:, column] = overage_orders
+        periods['credit'][:, column] = state['credit']
+        periods['cost'][:, column] = period_cost
+    
+    return periods
+
+def purchase_schedule_df(tariff, volumes, contract_periods, period_labels=None):
+    """Genereert het (vooruit geplande) aankoopschema van één klant over een volumereeks"""
+    volumes = np.asarray(volumes, dtype=np.int64)
+    state = start_purchase_plans(1, contract_periods)
+    periods = extend_purchase_plans(tariff, state, volumes.reshape(1, -1))
+    costs = periods['cost'][0]
+    
+    return pd.DataFrame({
+        'Periode': period_labels if period_labels is not None else np.arange(1, len(volumes) + 1),
+        'Orders': volumes,
+        'Cumulatief': np.cumsum(volumes),
+        'Startbundel': ['Big Start' if state['big_start'][0] else 'Small Start'] + [''] * (len(volumes) - 1),
+        'Big Prepaids': periods['big_prepaids'][0],
+        'Small Prepaids': periods['small_prepaids'][0],
+        'Overage Orders': periods['overage_orders'][0],
+        'Tegoed': periods['credit'][0],
+        'Kosten': from_cents(costs),
+        'Cumulatieve Kosten': from_cents(np.cumsum(costs))
+    })
+
+def batch_purchase_plans_df(tariff, volume_matrix, contract_periods, customer_labels=None):
+    """
+    Plant de aankopen voor een batch klanten (vorm (N, T)) en vergelijkt die met
+    de kosten die de Prijscalculator achteraf voor het totaal berekent.
+    
+    Het verschil is positief als de planner duurder uitvalt dan één aankoop van
+    het totaal, en kan negatief zijn als een prognose een big prepaid liet kopen
+    waar de Prijscalculator overage rekent.
+    
+    Returns:
+    - plans_df: Samenstelling en kosten per klant (in euro's)
+    - totals: Dictionary met 'planner_cost' en 'one_off_cost' over alle klanten in centen
+    """
+    volume_matrix = np.asarray(volume_matrix, dtype=np.int64)
+    state = start_purchase_plans(len(volume_matrix), contract_periods)
+    # In stukken van perioden, zodat de uitvoer per periode het geheugen niet vult
+    for start in range(0, volume_matrix.shape[1], PLANNER_PERIOD_CHUNK):
+        extend_purchase_plans(tariff, state, volume_matrix[:, start:start + PLANNER_PERIOD_CHUNK])
+    one_off, _ = calculate_costs_vectorized(state['orders'], **tariff)
+    
+    plans_df = pd.DataFrame({
+        'Klant': customer_labels if customer_labels is not None else np.arange(1, len(volume_matrix) + 1),
+        'Totaal Orders': state['orders'],
+        'Startbundel': np.where(state['big_start'], 'Big Start', 'Small Start'),
+        'Big Prepaids': state['big_prepaids'],
+        'Small Prepaids': state['small_prepaids'],
+        'Overage Orders': state['overage_orders'],
+        'Restant Tegoed': state['credit'],
+        'Kosten Planner': from_cents(state['cost']),
+        'Kosten Eenmalige Aankoop': from_cents(one_off),
+        'Verschil t.o.v. Eenmalige Aankoop': from_cents(state['cost'] - one_off)
+    })
+    totals = {'planner_cost': int(state['cost'].sum()), 'one_off_cost': int(one_off.sum())}
+    return plans_df, totals